@@ -4,13 +4,17 @@ import os
 import re
 import sys
 
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
 from xml.sax.saxutils import escape, quoteattr
 
-import sap.adt
-import sap.adt.atc
+import sap.cli.core
 from sap.cli.core import printout
 from sap.errors import SAPCliError
 
+# API modules are imported in the commands which use them
+
 CHECKSTYLE_VERSION = '8.36'
 ERROR = 'error'
 WARNING = 'warning'
@@ -23,6 +27,19 @@ SEVERITY_MAPPING = {
     '5': INFO
 }
 
+CHECKSTYLE_ERROR_TEMPLATE = ('<error line="{line}" column="{column}" severity={severity} '
+                             'message={message} source={source}/>\n')
+
+XML_ATTRIBUTE_SPECIAL_CHARS = frozenset('<>&"\'\n\r\t')
+
+DIVISION_SLASH_TABLE = str.maketrans({'/': '\u2215'})
+
+START_PATTERN = re.compile(r'start=(?P<line>\d+)(?:,(?P<column>\d+))?')
+
+# ADT connections share a single HTTP session whose connection pool and CSRF
+# token refresh are not meant for many concurrent requests
+MAX_JOBS = 8
+
 
 class ProfileCommandGroup(sap.cli.core.CommandGroup):
     """ATC profile commands
@@ -52,61 +69,68 @@ class CommandGroup(sap.cli.core.CommandGroup):
 def print_worklists_to_stream(all_results, stream, error_level=99):
     """Print results to stream"""
 
+    _int = int
+
     pad = ''
-    ret = 0
-    for run_results in all_results:
-        for obj in run_results.objects:
-            stream.write(f'{obj.object_type_id}/{obj.name}\n')
-            finiding_pad = pad + ' '
-            for finding in obj.findings:
-                if int(finding.priority) <= error_level:
-                    ret += 1
+    over_threshold = False
+    lines = []
+    append = lines.append
+    for obj in chain.from_iterable(run_results.objects for run_results in all_results):
+        append(f'{obj.object_type_id}/{obj.name}\n')
+        finiding_pad = pad + ' '
+        for finding in obj.findings:
+            priority = finding.priority
+            # once a finding reaches the error level the result is known
+            if not over_threshold and _int(priority) <= error_level:
+                over_threshold = True
 
-                stream.write(f'*{finiding_pad}{finding.priority} :: {finding.check_title} :: {finding.message_title}\n')
+            append(f'*{finiding_pad}{priority} :: {finding.check_title} :: {finding.message_title}\n')
 
-    return 0 if ret < 1 else 1
+    stream.write(''.join(lines))
+    return 1 if over_threshold else 0
 
 
 # pylint: disable=invalid-name
 def print_worklists_as_html_to_stream(all_results, stream, error_level=99):
     """Print results as html table to stream"""
 
-    ret = 0
-    stream.write('<table>\n')
-    for run_results in all_results:
-        for obj in run_results.objects:
-            stream.write('<tr><th>Object type ID</th>\n'
-                         '<th>Name</th></tr>\n')
-            stream.write(f'<tr><td>{escape(obj.object_type_id)}</td>\n'
-                         f'<td>{escape(obj.name)}</td></tr>\n')
-            stream.write('<tr><th>Priority</th>\n'
-                         '<th>Check title</th>\n'
-                         '<th>Message title</th></tr>\n')
-            for finding in obj.findings:
-                if int(finding.priority) <= error_level:
-                    ret += 1
-                stream.write(f'<tr><td>{escape(str(finding.priority))}</td>\n'
-                             f'<td>{escape(finding.check_title)}</td>\n'
-                             f'<td>{escape(finding.message_title)}</td></tr>\n')
-
-    stream.write('</table>\n')
-    return 0 if ret < 1 else 1
+    _escape = escape
+    _int = int
+
+    over_threshold = False
+    lines = ['<table>\n']
+    append = lines.append
+    for obj in chain.from_iterable(run_results.objects for run_results in all_results):
+        append('<tr><th>Object type ID</th>\n'
+               '<th>Name</th></tr>\n')
+        append(f'<tr><td>{_escape(obj.object_type_id)}</td>\n'
+               f'<td>{_escape(obj.name)}</td></tr>\n')
+        append('<tr><th>Priority</th>\n'
+               '<th>Check title</th>\n'
+               '<th>Message title</th></tr>\n')
+        for finding in obj.findings:
+            priority = finding.priority
+            if not over_threshold and _int(priority) <= error_level:
+                over_threshold = True
+            append(f'<tr><td>{_escape(str(priority))}</td>\n'
+                   f'<td>{_escape(finding.check_title)}</td>\n'
+                   f'<td>{_escape(finding.message_title)}</td></tr>\n')
+
+    append('</table>\n')
+    stream.write(''.join(lines))
+    return 1 if over_threshold else 0
 
 
 def replace_slash(name):
     """Replaces slash with division slash symbol for CheckStyle Jenkins plugin"""
 
-    DIVISION_SLASH = '\u2215'
-
-    return (name or '').replace('/', DIVISION_SLASH)
+    return (name or '').translate(DIVISION_SLASH_TABLE)
 
 
 def get_line_and_column(location):
     """Finds line and column in location"""
 
-    START_PATTERN = r'(start=)(?P<line>\d+)(,(?P<column>\d+))?'
-
-    search_result = re.search(START_PATTERN, location or '')
+    search_result = START_PATTERN.search(location or '')
 
     line = column = '0'
     if search_result:
@@ -116,51 +140,111 @@ def get_line_and_column(location):
     return line, column
 
 
-# pylint: disable=invalid-name
+def quote_attribute(value):
+    """Returns the value quoted for an XML attribute but calls quoteattr
+       only when the value contains characters which need escaping
+    """
+
+    if XML_ATTRIBUTE_SPECIAL_CHARS.isdisjoint(value):
+        return f'"{value}"'
+
+    return quoteattr(value)
+
+
+# pylint: disable=invalid-name,too-many-locals
 def print_worklists_as_checkstyle_xml_to_stream(all_results, stream, error_level=99, severity_mapping=None):
     """Print results as checkstyle xml to stream for all worklists"""
 
     if not severity_mapping:
         severity_mapping = SEVERITY_MAPPING
 
-    stream.write('<?xml version="1.0" encoding="UTF-8"?>\n')
-    stream.write(f'<checkstyle version="{CHECKSTYLE_VERSION}">\n')
-    ret = 0
-    for run_results in all_results:
-        for obj in run_results.objects:
-            package_name = replace_slash(obj.typ)
-            name = replace_slash(f'{obj.package_name}/{obj.name}')
-            filename = f'{package_name}/{name}'
-            stream.write(f'<file name={quoteattr(filename)}>\n')
-            for finding in obj.findings:
-                if int(finding.priority) <= error_level:
-                    ret += 1
-                severity = severity_mapping.get(str(finding.priority), INFO)
-                line, column = get_line_and_column(finding.location)
-                stream.write(f'<error '
-                             f'line={quoteattr(line)} '
-                             f'column={quoteattr(column)} '
-                             f'severity={quoteattr(severity)} '
-                             f'message={quoteattr(finding.message_title)} '
-                             f'source={quoteattr(finding.check_title)}'
-                             f'/>\n')
-            stream.write('</file>\n')
-
-    stream.write('</checkstyle>\n')
-    return 0 if ret < 1 else 1
+    _quote = quote_attribute
+    _int = int
+    _get_line_and_column = get_line_and_column
+    format_error = CHECKSTYLE_ERROR_TEMPLATE.format
+
+    quoted_info = _quote(INFO)
+    quoted_severities = defaultdict(lambda: quoted_info)
+    quoted_severities.update((priority, _quote(severity)) for priority, severity in severity_mapping.items())
+
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>\n',
+             f'<checkstyle version="{CHECKSTYLE_VERSION}">\n']
+    append = lines.append
+    over_threshold = False
+    # object types repeat across objects
+    typ_names = {}
+    for obj in chain.from_iterable(run_results.objects for run_results in all_results):
+        try:
+            package_name = typ_names[obj.typ]
+        except KeyError:
+            package_name = typ_names[obj.typ] = replace_slash(obj.typ)
+
+        name = replace_slash(f'{obj.package_name}/{obj.name}')
+        filename = f'{package_name}/{name}'
+        append(f'<file name={_quote(filename)}>\n')
+        for finding in obj.findings:
+            priority = finding.priority
+            if not over_threshold and _int(priority) <= error_level:
+                over_threshold = True
+            # the priority is parsed from XML and therefore already a string
+            if not isinstance(priority, str):
+                priority = str(priority)
+            severity = quoted_severities[priority]
+            # line and column are always digits and need no escaping
+            line, column = _get_line_and_column(finding.location)
+            append(format_error(line=line,
+                                column=column,
+                                severity=severity,
+                                message=_quote(finding.message_title),
+                                source=_quote(finding.check_title)))
+        append('</file>\n')
+
+    append('</checkstyle>\n')
+    stream.write(''.join(lines))
+    return 1 if over_threshold else 0
+
+
+def run_checks_in_parallel(connection, variant, objects, max_verdicts, jobs):
+    """Runs checks for every object in a separate ATC run and returns
+       the list of worklists in the order of the given objects
+    """
+
+    from sap.adt import atc as atc_api
+    from sap.adt import objects as adt_objects
+
+    def run_for_object(obj):
+        object_sets = adt_objects.ADTObjectSets()
+        object_sets.include_object(obj)
+
+        checks = atc_api.ChecksRunner(connection, variant)
+        return checks.run_for(object_sets, max_verdicts=max_verdicts).worklist
+
+    # the first run establishes the HTTP session and fetches the CSRF token
+    # which must not happen concurrently
+    results = [run_for_object(objects[0])]
+
+    remaining = objects[1:]
+    if remaining:
+        with ThreadPoolExecutor(max_workers=min(jobs, MAX_JOBS, len(remaining))) as executor:
+            results.extend(executor.map(run_for_object, remaining))
+
+    return results
 
 
 @CommandGroup.command()
 def customizing(connection, _):
     """Retrieves ATC customizing"""
 
-    settings = sap.adt.atc.fetch_customizing(connection)
+    from sap.adt import atc as atc_api
+
+    settings = atc_api.fetch_customizing(connection)
 
     printout('System Check Variant:', settings.system_check_variant)
 
 
 @CommandGroup.argument('-m', '--max-verdicts', default=100, type=int,
-                       help='Maximum number of findings; default == 100')
+                       help='Maximum number of findings per run of a single object; a run of several objects '
+                            'gets this number multiplied by the number of objects in total; default == 100')
 @CommandGroup.argument('-r', '--variant', default=None, type=str,
                        help='Executed Check Variant; default: the system variant')
 @CommandGroup.argument('-e', '--error-level', default=2, type=int,
@@ -171,6 +255,9 @@ def customizing(connection, _):
                        help='Output format in which checks will be printed')
 @CommandGroup.argument('-s', '--severity-mapping', default=None, type=str,
                        help='Severity mapping between error levels and Checkstyle severities')
+@CommandGroup.argument('-j', '--jobs', default=1, type=int,
+                       help='Check every object in a separate run with this number of parallel runs '
+                            f'(at most {MAX_JOBS}); default == 1 - all objects checked in a single run')
 @CommandGroup.command()
 def run(connection, args):
     """Prints it out based on command line configuration.
@@ -181,6 +268,9 @@ def run(connection, args):
            - when severity_maping argument has invalid format
     """
 
+    from sap.adt import atc as atc_api
+    from sap.adt import objects as adt_objects
+
     types = {'program': sap.adt.Program, 'class': sap.adt.Class, 'package': sap.adt.Package}
     try:
         typ = types[args.type]
@@ -207,22 +297,30 @@ def run(connection, args):
                 raise SAPCliError('Severity mapping has incorrect format') from ex
 
     if args.variant is None:
-        settings = sap.adt.atc.fetch_customizing(connection)
+        settings = atc_api.fetch_customizing(connection)
         args.variant = settings.system_check_variant
 
-    results = []
-    for objname in args.name:
-        checks = sap.adt.atc.ChecksRunner(connection, args.variant)
-        objects = sap.adt.objects.ADTObjectSets()
-        objects.include_object(typ(connection, objname))
-        atcResult = checks.run_for(objects, max_verdicts=args.max_verdicts)
-        results.append(atcResult.worklist)
+    if args.jobs > 1:
+        objects = [typ(connection, objname) for objname in args.name]
+        results = run_checks_in_parallel(connection, args.variant, objects, args.max_verdicts, args.jobs)
+    else:
+        checks = atc_api.ChecksRunner(connection, args.variant)
+
+        objects = adt_objects.ADTObjectSets()
+        for objname in args.name:
+            objects.include_object(typ(connection, objname))
+
+        # all objects are checked in a single run sharing the budget of all objects
+        atcResult = checks.run_for(objects, max_verdicts=args.max_verdicts * len(args.name))
+        results = [atcResult.worklist]
 
     if args.output == 'checkstyle':
         result = printer(results, sys.stdout, error_level=args.error_level, severity_mapping=severity_mapping)
     else:
         result = printer(results, sys.stdout, error_level=args.error_level)
 
+    sys.stdout.flush()
+
     return result
 
 
@@ -236,10 +334,13 @@ def run(connection, args):
 def profile_list(connection, args):
     """Retrieves ATC profiles."""
 
-    result = sap.adt.atc.fetch_profiles(connection)
+    from sap.adt import atc as atc_api
+
+    result = atc_api.fetch_profiles(connection)
 
     if args.output == 'json':
-        printout(json.dumps(result, indent=2))
+        json.dump(result, sys.stdout, indent=2)
+        sys.stdout.write('\n')
     else:
         header_printed = args.noheadings
         for (profile_id, profile) in result.items():
@@ -269,6 +370,10 @@ def profile_list(connection, args):
 def profile_dump(connection, args):
     """Dumps ATC profiles."""
 
-    result = sap.adt.atc.dump_profiles(connection, args.profiles, args.checkman)
+    from sap.adt import atc as atc_api
+
+    result = atc_api.dump_profiles(connection, args.profiles, args.checkman)
 
-    printout(json.dumps(result, indent=2))
+    # stream the potentially large document instead of building it in memory
+    json.dump(result, sys.stdout, indent=2)
+    sys.stdout.write('\n')
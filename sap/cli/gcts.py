@@ -2,34 +2,40 @@
 
 import sap.cli.core
 import sap.cli.helpers
-import sap.rest.gcts
+
+# the API module is imported in the commands which use it
 
 
 def print_gcts_message(console, log, prefix=' '):
     """Print out the message with its protocol if it exists."""
 
-    if isinstance(log, str):
-        message = log
-    else:
-        message = log.get('message', None)
+    # walk the protocol tree without recursion; children are pushed in
+    # reverse order to print them in the original order
+    stack = [(log, prefix)]
+    while stack:
+        log, prefix = stack.pop()
 
-    if message:
-        console.printerr(prefix, message)
-        prefix = prefix + '  '
+        if isinstance(log, str):
+            message = log
+        else:
+            message = log.get('message', None)
 
-    if not isinstance(log, dict):
-        return
+        if message:
+            console.printerr(prefix, message)
+            prefix = prefix + '  '
 
-    try:
-        protocol = log['protocol']
-    except KeyError:
-        return
+        if not isinstance(log, dict):
+            continue
+
+        try:
+            protocol = log['protocol']
+        except KeyError:
+            continue
 
-    if isinstance(protocol, dict):
-        protocol = [protocol]
+        if isinstance(protocol, dict):
+            protocol = [protocol]
 
-    for protocol_item in protocol:
-        print_gcts_message(console, protocol_item, prefix=prefix)
+        stack.extend((protocol_item, prefix) for protocol_item in reversed(protocol))
 
 
 def dump_gcts_messages(console, messages):
@@ -59,13 +65,14 @@ def dump_gcts_messages(console, messages):
         console.printerr(str(messages))
 
 
-def print_gcts_commit(console, commit_data):
-    """Prints out gCTS commit description"""
+def format_gcts_commit(commit_data):
+    """Returns gCTS commit description as a single string"""
 
-    console.printout('commit', commit_data['id'])
-    console.printout('Author:', commit_data['author'], f'<{commit_data["authorMail"]}>')
-    console.printout('Date:  ', commit_data['date'])
-    console.printout('\n   ', commit_data['message'])
+    return (f'commit {commit_data["id"]}\n'
+            f'Author: {commit_data["author"]} <{commit_data["authorMail"]}>\n'
+            f'Date:   {commit_data["date"]}\n'
+            '\n'
+            f'    {commit_data["message"]}')
 
 
 class UserCommandGroup(sap.cli.core.CommandGroup):
@@ -81,7 +88,9 @@ class UserCommandGroup(sap.cli.core.CommandGroup):
 def user_credentials(connection, args):
     """Set user credentials"""
 
-    sap.rest.gcts.simple_set_user_api_token(connection, args.api_url, args.token)
+    from sap.rest import gcts as gcts_api
+
+    gcts_api.simple_set_user_api_token(connection, args.api_url, args.token)
 
 
 class RepoCommandGroup(sap.cli.core.CommandGroup):
@@ -97,7 +106,9 @@ class RepoCommandGroup(sap.cli.core.CommandGroup):
 def set_url(connection, args):
     """Set repo URL"""
 
-    repo = sap.rest.gcts.Repository(connection, args.package)
+    from sap.rest import gcts as gcts_api
+
+    repo = gcts_api.Repository(connection, args.package)
     sap.cli.core.printout(repo.set_url(args.url))
 
 
@@ -127,32 +138,26 @@ class TableWriter:
 
     def __init__(self, data, attrs, headers):
         self._headers = headers
-        self._widths = [len(h) for h in headers]
-        self._lines = []
+        self._lines = [[str(getattr(item, attr)) for attr in attrs] for item in data]
 
-        for item in data:
-            line = []
-
-            for i, attr in enumerate(attrs):
-                val = str(getattr(item, attr))
-
-                if self._widths[i] < len(val):
-                    self._widths[i] = len(val)
-
-                line.append(val)
-
-            self._lines.append(line)
+        columns = zip(*self._lines) if self._lines else [()] * len(headers)
+        self._widths = [max(len(header), max(map(len, column), default=0))
+                        for header, column in zip(headers, columns)]
 
     def printout(self, console, separator=" | "):
         """Prints out the content"""
 
-        fmt = separator.join(('{:<%s}' % (w) for w in self._widths))
+        widths = self._widths
+
+        def format_line(line):
+            return separator.join(cell.ljust(width) for cell, width in zip(line, widths))
 
-        console.printout(fmt.format(*self._headers))
-        console.printout('-' * (sum(self._widths) + len(separator) * (len(self._headers) - 1)))
+        divider = '-' * (sum(widths) + len(separator) * (len(self._headers) - 1))
 
-        for line in self._lines:
-            console.printout(fmt.format(*line))
+        table = [format_line(self._headers), divider]
+        table.extend(format_line(line) for line in self._lines)
+
+        console.printout('\n'.join(table))
 
 
 @CommandGroup.command()
@@ -160,11 +165,13 @@ class TableWriter:
 def repolist(connection, args):
     """ls"""
 
+    from sap.rest import gcts as gcts_api
+
     console = sap.cli.core.get_console()
 
     try:
-        response = sap.rest.gcts.simple_fetch_repos(connection)
-    except sap.rest.gcts.GCTSRequestError as ex:
+        response = gcts_api.simple_fetch_repos(connection)
+    except gcts_api.GCTSRequestError as ex:
         dump_gcts_messages(console, ex.messages)
         return 1
 
@@ -191,22 +198,24 @@ def clone(connection, args):
     """git clone <repository> [<package>]
     """
 
+    from sap.rest import gcts as gcts_api
+
     package = args.package
     if not package:
-        package = sap.rest.gcts.package_name_from_url(args.url)
+        package = gcts_api.package_name_from_url(args.url)
 
     console = sap.cli.core.get_console()
 
     try:
         with sap.cli.helpers.ConsoleHeartBeat(console, args.heartbeat):
-            repo = sap.rest.gcts.simple_clone(connection, args.url, package,
-                                              start_dir=args.starting_folder,
-                                              vcs_token=args.vcs_token,
-                                              vsid=args.vsid,
-                                              error_exists=not args.no_fail_exists,
-                                              role=args.role,
-                                              typ=args.type)
-    except sap.rest.gcts.GCTSRequestError as ex:
+            repo = gcts_api.simple_clone(connection, args.url, package,
+                                         start_dir=args.starting_folder,
+                                         vcs_token=args.vcs_token,
+                                         vsid=args.vsid,
+                                         error_exists=not args.no_fail_exists,
+                                         role=args.role,
+                                         typ=args.type)
+    except gcts_api.GCTSRequestError as ex:
         dump_gcts_messages(sap.cli.core.get_console(), ex.messages)
         return 1
 
@@ -225,14 +234,16 @@ def config(connection, args):
     """git config [-l] [<package>]
     """
 
+    from sap.rest import gcts as gcts_api
+
     console = sap.cli.core.get_console()
 
     if args.list:
-        repo = sap.rest.gcts.Repository(connection, args.package)
+        repo = gcts_api.Repository(connection, args.package)
 
         try:
             configuration = repo.configuration
-        except sap.rest.gcts.GCTSRequestError as ex:
+        except gcts_api.GCTSRequestError as ex:
             dump_gcts_messages(sap.cli.core.get_console(), ex.messages)
             return 1
 
@@ -251,9 +262,11 @@ def delete(connection, args):
     """rm
     """
 
+    from sap.rest import gcts as gcts_api
+
     try:
-        sap.rest.gcts.simple_delete(connection, args.package)
-    except sap.rest.gcts.GCTSRequestError as ex:
+        gcts_api.simple_delete(connection, args.package)
+    except gcts_api.GCTSRequestError as ex:
         dump_gcts_messages(sap.cli.core.get_console(), ex.messages)
         return 1
 
@@ -269,15 +282,17 @@ def checkout(connection, args):
     """git checkout <branch>
     """
 
-    repo = sap.rest.gcts.Repository(connection, args.package)
+    from sap.rest import gcts as gcts_api
+
+    repo = gcts_api.Repository(connection, args.package)
     old_branch = repo.branch
 
     console = sap.cli.core.get_console()
 
     try:
         with sap.cli.helpers.ConsoleHeartBeat(console, args.heartbeat):
-            response = sap.rest.gcts.simple_checkout(connection, args.branch, repo=repo)
-    except sap.rest.gcts.GCTSRequestError as ex:
+            response = gcts_api.simple_checkout(connection, args.branch, repo=repo)
+    except gcts_api.GCTSRequestError as ex:
         dump_gcts_messages(sap.cli.core.get_console(), ex.messages)
         return 1
 
@@ -292,24 +307,19 @@ def gcts_log(connection, args):
     """git log
     """
 
+    from sap.rest import gcts as gcts_api
+
     console = sap.cli.core.get_console()
     try:
-        commits = sap.rest.gcts.simple_log(connection, name=args.package)
-    except sap.rest.gcts.GCTSRequestError as ex:
+        commits = gcts_api.simple_log(connection, name=args.package)
+    except gcts_api.GCTSRequestError as ex:
         dump_gcts_messages(console, ex.messages)
         return 1
 
     if not commits:
         return 0
 
-    commit_iter = iter(commits)
-
-    commit_item = next(commit_iter)
-    print_gcts_commit(console, commit_item)
-
-    for commit_item in commit_iter:
-        console.printout('')
-        print_gcts_commit(console, commit_item)
+    console.printout('\n\n'.join(format_gcts_commit(commit_item) for commit_item in commits))
 
     return 0
 
@@ -321,12 +331,14 @@ def pull(connection, args):
     """git pull
     """
 
+    from sap.rest import gcts as gcts_api
+
     console = sap.cli.core.get_console()
 
     try:
         with sap.cli.helpers.ConsoleHeartBeat(console, args.heartbeat):
-            response = sap.rest.gcts.simple_pull(connection, name=args.package)
-    except sap.rest.gcts.GCTSRequestError as ex:
+            response = gcts_api.simple_pull(connection, name=args.package)
+    except gcts_api.GCTSRequestError as ex:
         dump_gcts_messages(sap.cli.core.get_console(), ex.messages)
         return 1
 
@@ -345,13 +357,15 @@ def commit(connection, args):
     """git commit
     """
 
+    from sap.rest import gcts as gcts_api
+
     console = sap.cli.core.get_console()
-    repo = sap.rest.gcts.Repository(connection, args.package)
+    repo = gcts_api.Repository(connection, args.package)
 
     try:
         with sap.cli.helpers.ConsoleHeartBeat(console, args.heartbeat):
             repo.commit_transport(args.corrnr, args.message or f'Transport {args.corrnr}', args.description)
-    except sap.rest.gcts.GCTSRequestError as ex:
+    except gcts_api.GCTSRequestError as ex:
         dump_gcts_messages(sap.cli.core.get_console(), ex.messages)
         return 1
 
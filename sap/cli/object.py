@@ -40,11 +40,11 @@ def object_name_from_source_file(filesystem_path):
 
 def write_args_to_objects(command, connection, args, metadata=None):
     """Converts parameters of the action 'write object' into a iteration of
-       objects with the text lines content
+       objects with the text content
     """
 
     name = args.name
-    text_lines = None
+    text = None
 
     if name == '-':
         for filepath in args.source:
@@ -54,18 +54,18 @@ def write_args_to_objects(command, connection, args, metadata=None):
             obj = command.instance_from_file_path(connection, filepath, args, metadata=metadata)
 
             with open(filepath, 'r', encoding='utf8') as filesrc:
-                text_lines = filesrc.readlines()
+                text = filesrc.read()
 
-            yield (obj, text_lines)
+            yield (obj, text)
 
     elif len(args.source) == 1:
         if args.source[0] == '-':
-            text_lines = sys.stdin.readlines()
+            text = sys.stdin.read()
         else:
             with open(args.source[0], 'r', encoding='utf8') as filesrc:
-                text_lines = filesrc.readlines()
+                text = filesrc.read()
 
-        yield (command.instance(connection, args.name, args, metadata=metadata), text_lines)
+        yield (command.instance(connection, args.name, args, metadata=metadata), text)
 
     else:
         raise InvalidCommandLineError('Source file can be a list only when Object name is -')
@@ -266,7 +266,7 @@ class CommandGroupObjectTemplate(sap.cli.core.CommandGroup):
             printout('*', str(obj))
 
             with obj.open_editor(corrnr=args.corrnr) as editor:
-                editor.write(''.join(text))
+                editor.write(text)
 
             toactivate[obj.name] = obj
 
@@ -2,6 +2,7 @@
 
 import os
 import json
+import logging
 
 import socket
 from urllib3.connection import HTTPConnection
@@ -125,7 +126,11 @@ class Connection:
         except requests.exceptions.ConnectTimeout as ex:
             raise TimedOutRequestError(req, self._timeout) from ex
 
-        mod_log().debug('Response %s %s:\n++++\n%s\n++++', method, url, res.text)
+        # decoding the body to text is expensive for large responses
+        # which callers often consume as bytes or not at all
+        logger = mod_log()
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('Response %s %s:\n++++\n%s\n++++', method, url, res.text)
 
         return (req, res)
 
@@ -2,10 +2,24 @@
 
 # ABAP Package: SCTS_ABAP_AND_VCS
 
+import copy
+import functools
+import json
+import threading
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+
 from sap import get_logger
 
 from sap.errors import SAPCliError
-from sap.rest.errors import HTTPRequestError
+from sap.rest.errors import HTTPRequestError, UnexpectedResponseContent
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # pylint: disable=invalid-name
 
 
 def mod_log():
@@ -14,6 +28,24 @@ def mod_log():
     return get_logger()
 
 
+def json_loads(data):
+    """Parses JSON with orjson if available"""
+
+    if orjson is not None:
+        return orjson.loads(data)  # pylint: disable=no-member
+
+    return json.loads(data)
+
+
+def json_dumps(obj):
+    """Serializes the object to UTF-8 encoded JSON with orjson if available"""
+
+    if orjson is not None:
+        return orjson.dumps(obj)  # pylint: disable=no-member
+
+    return json.dumps(obj).encode('utf-8')
+
+
 class GCTSRequestError(SAPCliError):
     """Base gCTS error type"""
 
@@ -44,6 +76,7 @@ class GCTSRepoNotExistsError(GCTSRequestError):
         self.messages['exception'] = 'Repository does not exist'
 
 
+
 def exception_from_http_error(http_error):
     """Converts HTTPRequestError to proper instance"""
 
@@ -63,10 +96,11 @@ def exception_from_http_error(http_error):
     return GCTSRequestError(messages)
 
 
+@functools.lru_cache(maxsize=1024)
 def package_name_from_url(url):
     """Parse out Package name from a repo git url"""
 
-    url_repo_part = url.split('/')[-1]
+    url_repo_part = url.rpartition('/')[2]
 
     if url_repo_part.endswith('.git'):
         return url_repo_part[:-4]
@@ -74,80 +108,151 @@ def package_name_from_url(url):
     return url_repo_part
 
 
-def _set_configuration_key(config, key, value):
-    item = next((cfg for cfg in config if cfg['key'] == key), None)
-    if item:
-        item['value'] = value
-    else:
-        config.append({'key': key, 'value': value})
-    return config
-
-
 def _config_list_to_dict(config):
 
     return dict(((cfg['key'], cfg.get('value', '')) for cfg in config))
 
 
-def _config_dict_to_list(config):
+class _RepositoryHttpProxy:
 
-    return [{'key': key, 'value': value} for key, value in config.items()]
+    def __init__(self, connection, name):
+        self.url_prefix = f'repository/{name}'
+        self.url_prefix_slash = self.url_prefix + '/'
+        self.connection = connection
 
+    def _execute(self, method, path, **kwargs):
+        """Executes the HTTP request for the repository sub-path and converts
+           HTTP errors to gCTS errors
+        """
 
-def _http_to_gcts_error(func):
+        url = self.url_prefix if path is None else self.url_prefix_slash + path
 
-    def try_except_wrapper(*args, **kwargs):
         try:
-            return func(*args, **kwargs)
+            return self.connection.execute(method, url, **kwargs)
         except HTTPRequestError as ex:
             raise exception_from_http_error(ex) from ex
 
-    return try_except_wrapper
+    def get(self, path=None, params=None):
+        """Execute HTTP GET."""
 
+        return self._execute('GET', path, params=params)
 
-class _RepositoryHttpProxy:
+    def get_json(self, path=None):
+        """Execute HTTP GET with Accept: application/json and get only the JSON part."""
 
-    def __init__(self, connection, name):
-        self.url_prefix = f'repository/{name}'
-        self.connection = connection
+        return json_loads(self._execute('GET', path, accept='application/json').content)
 
-    def _build_url(self, path):
-        url = self.url_prefix
-        if path is not None:
-            url = f'{url}/{path}'
+    def get_if_modified(self, path=None, etag=None, last_modified=None):
+        """Execute conditional HTTP GET with Accept: application/json and
+           return the response or None if the resource has not been modified.
+        """
 
-        return url
+        if etag is None and last_modified is None:
+            return self._execute('GET', path, accept='application/json')
 
-    @_http_to_gcts_error
-    def get(self, path=None, params=None):
-        """Execute HTTP GET."""
+        headers = {'Accept': 'application/json'}
+        if etag is not None:
+            headers['If-None-Match'] = etag
 
-        return self.connection.execute('GET', self._build_url(path), params=params)
+        if last_modified is not None:
+            headers['If-Modified-Since'] = last_modified
 
-    @_http_to_gcts_error
-    def get_json(self, path=None):
-        """Execute HTTP GET with Accept: application/json and get only the JSON part."""
+        response = self._execute('GET', path, headers=headers)
+        if response.status_code == 304:
+            return None
 
-        return self.connection.get_json(self._build_url(path))
+        # Connection checks Content-Type only for the parameter accept
+        content_type = response.headers.get('Content-Type', '')
+        if not content_type.startswith('application/json'):
+            raise UnexpectedResponseContent(['application/json'], content_type, response.text)
+
+        return response
 
-    @_http_to_gcts_error
     def post(self, path=None):
         """Execute HTTP POST"""
 
-        return self.connection.execute('POST', self._build_url(path))
+        return self._execute('POST', path)
 
-    @_http_to_gcts_error
-    def post_obj_as_json(self, path, json, accept=None):
+    def post_obj_as_json(self, path, obj, accept=None):
         """Execute HTTP POST with content of the given object formatted as JSON"""
 
-        return self.connection.post_obj_as_json(self._build_url(path), json, accept=accept)
+        return self._execute('POST', path, body=json_dumps(obj), content_type='application/json', accept=accept)
 
-    @_http_to_gcts_error
     def delete(self, path=None):
         """Execute HTTP DELETE"""
 
-        return self.connection.execute('DELETE', self._build_url(path))
+        return self._execute('DELETE', path)
+
+
+class _RepositoryDataCache:
+    """Repository data shared by all Repository instances of a connection
+
+       The cache keeps its own copies because Repository instances modify
+       their data.
+    """
+
+    def __init__(self, maxsize):
+        self._maxsize = maxsize
+        self._connections = weakref.WeakKeyDictionary()
+        # hydrate_configs() fills the cache from several threads
+        self._lock = threading.Lock()
+
+    def _repositories(self, connection, create=False):
+        try:
+            repositories = self._connections.get(connection, None)
+        except TypeError:
+            # connection cannot be weakly referenced - e.g. None
+            return None
+
+        if repositories is None and create:
+            repositories = self._connections[connection] = OrderedDict()
+
+        return repositories
+
+    def get(self, connection, name):
+        """Returns the cached data or None"""
+
+        with self._lock:
+            repositories = self._repositories(connection)
+            if not repositories or name not in repositories:
+                return None
+
+            repositories.move_to_end(name)
+            data = repositories[name]
+
+        return copy.deepcopy(data)
+
+    def put(self, connection, name, data):
+        """Caches the data and evicts the least recently used repository
+           if the cache is full
+        """
+
+        data = copy.deepcopy(data)
+
+        with self._lock:
+            repositories = self._repositories(connection, create=True)
+            if repositories is None:
+                return
 
+            repositories[name] = data
+            repositories.move_to_end(name)
 
+            if len(repositories) > self._maxsize:
+                repositories.popitem(last=False)
+
+    def invalidate(self, connection, name):
+        """Removes the cached data"""
+
+        with self._lock:
+            repositories = self._repositories(connection)
+            if repositories:
+                repositories.pop(name, None)
+
+
+_REPOSITORY_DATA_CACHE = _RepositoryDataCache(maxsize=512)
+
+
+# pylint: disable=too-many-public-methods
 class Repository:
     """A proxy to gCTS repository"""
 
@@ -157,15 +262,33 @@ class Repository:
         self._data = data
 
         self._config = None
-        if self._data:
-            self._config = self._data.get('config', None)
+        if self._data and self._data.get('config', None) is not None:
+            self._config = _config_list_to_dict(self._data['config'])
+
+        # validators and body of the last fetched data for conditional GET
+        self._etag = None
+        self._last_modified = None
+        self._fetched_content = None
 
     def _fetch_data(self):
         mod_log().debug('Fetching data of the repository "%s"', self._name)
 
-        response = self._http.get_json()
+        response = self._http.get_if_modified(etag=self._etag, last_modified=self._last_modified)
+
+        if response is None:
+            mod_log().debug('Data of the repository "%s" not modified', self._name)
+            content = self._fetched_content
+        else:
+            content = response.content
+            self._etag = response.headers.get('ETag', None)
+            self._last_modified = response.headers.get('Last-Modified', None)
+
+            # the parsed data are modified locally, hence keep the body
+            self._fetched_content = None
+            if self._etag is not None or self._last_modified is not None:
+                self._fetched_content = content
 
-        result = response['result']
+        result = json_loads(content)['result']
 
         mod_log().debug('Fetched data of the repository "%s": %s', self._name, result)
 
@@ -173,23 +296,53 @@ class Repository:
 
     def _update_configuration(self, key, value):
         if self._config is None:
-            self._config = []
+            self._config = {}
 
-        self._config = _set_configuration_key(self._config, key, value)
+        self._config[key] = value
         return self._config
 
     def _get_item(self, item, default=None, fetch=False):
+        if not fetch and self._data is None:
+            self._data = _REPOSITORY_DATA_CACHE.get(self._http.connection, self._name)
+
         if self._data is None or fetch:
-            self._data = self._fetch_data()
+            self.fetch_data()
 
         return self._data.get(item, default)
 
-    def wipe_data(self):
-        """Clears cached data"""
+    def fetch_data(self):
+        """Fetches the repository data including configuration and shares
+           them with other instances of the same repository
+        """
+
+        self._data = self._fetch_data()
+        self._config = None
+
+        _REPOSITORY_DATA_CACHE.put(self._http.connection, self._name, self._data)
+
+    @property
+    def has_configuration(self):
+        """Returns True if the loaded data include the configuration"""
+
+        return self._data is not None and 'config' in self._data
+
+    def wipe_data(self, force=False):
+        """Clears cached data
+
+           The next fetch asks the server whether the data have changed unless
+           force is True.
+        """
+
+        _REPOSITORY_DATA_CACHE.invalidate(self._http.connection, self._name)
 
         self._data = None
         self._config = None
 
+        if force:
+            self._etag = None
+            self._last_modified = None
+            self._fetched_content = None
+
     @property
     def name(self):
         """Returns the repository's name"""
@@ -243,9 +396,9 @@ class Repository:
         """Returns the current repository configuration"""
 
         if self._config is None:
-            self._config = self._get_item('config')
+            self._config = _config_list_to_dict(self._get_item('config'))
 
-        return _config_list_to_dict(self._config)
+        return MappingProxyType(self._config)
 
     def create(self, url, vsid, config=None, role='SOURCE', typ='GITHUB'):
         """Creates the repository
@@ -268,10 +421,14 @@ class Repository:
         })
 
         if config:
-            repo_config = _config_list_to_dict(repo.get('config', []))
-            repo_config.update(config)
-            request_config = _config_dict_to_list(repo_config)
-            repo['config'] = request_config
+            # update existing entries in place and append the new ones
+            request_config = repo.setdefault('config', [])
+            entries = {entry['key']: entry for entry in request_config}
+            for key, value in config.items():
+                try:
+                    entries[key]['value'] = value
+                except KeyError:
+                    request_config.append({'key': key, 'value': value})
 
         create_request = {
             'repository': self.name,
@@ -279,16 +436,24 @@ class Repository:
         }
 
         try:
-            response = self._http.connection.post_obj_as_json('repository', create_request, accept='application/json')
+            response = self._http.connection.execute('POST', 'repository',
+                                                     body=json_dumps(create_request),
+                                                     content_type='application/json',
+                                                     accept='application/json')
         except HTTPRequestError as ex:
             raise exception_from_http_error(ex) from ex
+        finally:
+            _REPOSITORY_DATA_CACHE.invalidate(self._http.connection, self._name)
 
-        result = response.json()['repository']
+        result = json_loads(response.content)['repository']
         if self._data:
             self._data.update(result)
         else:
             self._data = result
 
+        # a just created repository is not cloned yet
+        self._data.setdefault('status', 'CREATED')
+
     def set_config(self, key, value):
         """Sets configuration value
 
@@ -297,12 +462,26 @@ class Repository:
              GCTSRepoAlreadyExistsError
         """
 
-        self._http.post_obj_as_json('config', {
-            'key': key,
-            'value': value
-        })
+        self.set_configs({key: value})
 
-        self._update_configuration(key, value)
+    def set_configs(self, items):
+        """Sets several configuration values
+
+           Raises:
+             GCTSRequestError
+        """
+
+        try:
+            for key, value in items.items():
+                self._http.post_obj_as_json('config', {
+                    'key': key,
+                    'value': value
+                })
+
+                self._update_configuration(key, value)
+        finally:
+            # some of the values might have been set before a failure
+            _REPOSITORY_DATA_CACHE.invalidate(self._http.connection, self._name)
 
     def get_config(self, key):
         """Returns configuration value
@@ -314,7 +493,7 @@ class Repository:
 
         config = self.configuration
 
-        if config is not None and key in config:
+        if key in config:
             return config[key]
 
         response = self._http.get_json(f'config/{key}')
@@ -387,17 +566,51 @@ class Repository:
     def set_url(self, url):
         """Sets repository URL"""
 
-        data = self._fetch_data()
-        if data['url'] == url:
+        if not self._data or 'url' not in self._data:
+            self._data = self._fetch_data()
+
+        if self._data['url'] == url:
             return None
 
+        data = dict(self._data)
         data['url'] = url
-        return self._http.post_obj_as_json(None, data)
+        try:
+            response = self._http.post_obj_as_json(None, data)
+        finally:
+            _REPOSITORY_DATA_CACHE.invalidate(self._http.connection, self._name)
+
+        self._data['url'] = url
+        return response
+
+
+def hydrate_configs(repos, max_workers=8):
+    """Fetches complete data including configuration of the given
+       repositories whose data are not complete in parallel HTTP requests.
+    """
+
+    pending = [repo for repo in repos if not repo.has_configuration]
+    if not pending:
+        return repos
+
+    # the first request opens the HTTP session which must not happen
+    # concurrently
+    pending[0].fetch_data()
+
+    remaining = pending[1:]
+    if remaining:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(remaining))) as executor:
+            # consume the results to propagate errors
+            list(executor.map(lambda repo: repo.fetch_data(), remaining))
 
+    return repos
 
-def simple_fetch_repos(connection):
+
+def simple_fetch_repos(connection, eager_config=False):
     """Returns list of repositories in the target systems defined by the given
        connection.
+
+       If eager_config is True, configuration of repositories is fetched
+       right away.
     """
 
     try:
@@ -406,7 +619,19 @@ def simple_fetch_repos(connection):
         raise exception_from_http_error(ex) from ex
 
     result = response.get('result', [])
-    return [Repository(connection, repo['name'], data=repo) for repo in result]
+
+    # let later Repository instances use the listed data instead of fetching
+    # it again but only if the listed data are complete
+    for repo in result:
+        if 'config' in repo:
+            _REPOSITORY_DATA_CACHE.put(connection, repo['name'], repo)
+
+    repos = [Repository(connection, repo['name'], data=repo) for repo in result]
+
+    if eager_config:
+        hydrate_configs(repos)
+
+    return repos
 
 
 # pylint: disable=too-many-arguments
@@ -438,7 +663,7 @@ def simple_clone(connection, url, name, vsid='6IT', start_dir='src/', vcs_token=
     if not repo.is_cloned:
         repo.clone()
     else:
-        mod_log().info('Not cloning the repository "%s": already performed')
+        mod_log().info('Not cloning the repository "%s": already performed', name)
 
     return repo
 
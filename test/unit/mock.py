@@ -33,6 +33,13 @@ class Response:
 
         return self._json
 
+    @property
+    def content(self):
+        if self._json is not None:
+            return json.dumps(self._json).encode('utf-8')
+
+        return (self.text or '').encode('utf-8')
+
     @staticmethod
     def with_json(json=None, status_code=None, headers=None):
         return Response(json=json, content_type='application/json', headers=headers, status_code=status_code)
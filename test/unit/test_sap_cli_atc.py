@@ -1,7 +1,9 @@
 #!/usr/bin/env python3
 import os
 import sys
+import threading
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import patch, Mock, call
 from argparse import ArgumentParser
 from types import SimpleNamespace
@@ -163,6 +165,81 @@ class TestRun(unittest.TestCase):
         self.assertEqual(fake_object.call_args_list, [call(self.connection, fake_object.name), call(self.connection, '$TMP')])
         self.assertEqual(fake_sets.return_value.include_object.call_args_list, [call(fake_object.return_value), call(fake_object.return_value)])
 
+        fake_sets.assert_called_once()
+        fake_runner.assert_called_once_with(self.connection, 'THE_VARIANT')
+        fake_runner.return_value.run_for.assert_called_once_with(fake_sets.return_value, max_verdicts=200)
+
+    @patch('sap.cli.atc.print_worklists_to_stream')
+    @patch('sap.adt.objects.ADTObjectSets')
+    @patch('sap.adt.atc.ChecksRunner')
+    @patch('sap.adt.atc.fetch_customizing')
+    @patch('sap.adt.Package')
+    def test_package_multiple_jobs(self, fake_object, fake_fetch_customizing, fake_runner, fake_sets, fake_print):
+
+        self.setUpRunMocks(fake_object, '$PACKAGE', fake_fetch_customizing, fake_runner, fake_sets)
+
+        args = parse_args('run', 'package', fake_object.name, '$TMP', '--jobs', '4')
+        args.execute(self.connection, args)
+
+        self.assertEqual(fake_object.call_args_list, [call(self.connection, fake_object.name), call(self.connection, '$TMP')])
+        self.assertEqual(fake_sets.call_count, 2)
+        self.assertEqual(fake_runner.call_args_list, [call(self.connection, 'THE_VARIANT'), call(self.connection, 'THE_VARIANT')])
+        self.assertEqual(fake_runner.return_value.run_for.call_args_list,
+                         [call(fake_sets.return_value, max_verdicts=100), call(fake_sets.return_value, max_verdicts=100)])
+
+        call_args, _ = fake_print.call_args
+        self.assertEqual(call_args[0], ['WORKLIST', 'WORKLIST'])
+
+    @patch('sap.cli.atc.print_worklists_to_stream')
+    @patch('sap.adt.objects.ADTObjectSets')
+    @patch('sap.adt.atc.ChecksRunner')
+    @patch('sap.adt.atc.fetch_customizing')
+    @patch('sap.adt.Package')
+    def test_package_multiple_jobs_with_variant(self, fake_object, fake_fetch_customizing, fake_runner, fake_sets,
+                                                fake_print):
+
+        self.setUpRunMocks(fake_object, '$PACKAGE', fake_fetch_customizing, fake_runner, fake_sets)
+
+        run_threads = []
+
+        def run_for(*_, **__):
+            run_threads.append(threading.current_thread())
+            return Mock(worklist='WORKLIST')
+
+        fake_runner.return_value.run_for.side_effect = run_for
+
+        args = parse_args('run', 'package', fake_object.name, '$TMP', '$LOCAL', '-r', 'MY_SPECIAL_VARIANT',
+                          '--jobs', '4')
+        args.execute(self.connection, args)
+
+        fake_fetch_customizing.assert_not_called()
+        self.assertEqual(fake_runner.call_count, 3)
+
+        # the first run must open the HTTP session before the parallel runs
+        self.assertEqual(len(run_threads), 3)
+        self.assertIs(run_threads[0], threading.main_thread())
+
+        call_args, _ = fake_print.call_args
+        self.assertEqual(call_args[0], ['WORKLIST', 'WORKLIST', 'WORKLIST'])
+
+    @patch('sap.cli.atc.ThreadPoolExecutor', wraps=ThreadPoolExecutor)
+    @patch('sap.cli.atc.print_worklists_to_stream')
+    @patch('sap.adt.objects.ADTObjectSets')
+    @patch('sap.adt.atc.ChecksRunner')
+    @patch('sap.adt.atc.fetch_customizing')
+    @patch('sap.adt.Package')
+    def test_package_multiple_jobs_capped(self, fake_object, fake_fetch_customizing, fake_runner, fake_sets,
+                                          fake_print, fake_executor):
+
+        self.setUpRunMocks(fake_object, '$PACKAGE', fake_fetch_customizing, fake_runner, fake_sets)
+
+        names = [f'$PACKAGE{i}' for i in range(20)]
+        args = parse_args('run', 'package', *names, '--jobs', '16')
+        args.execute(self.connection, args)
+
+        fake_executor.assert_called_once_with(max_workers=sap.cli.atc.MAX_JOBS)
+        self.assertEqual(fake_runner.return_value.run_for.call_count, 20)
+
     @patch('sap.cli.atc.print_worklists_to_stream')
     @patch('sap.adt.objects.ADTObjectSets')
     @patch('sap.adt.atc.ChecksRunner')
@@ -279,6 +356,75 @@ class TestRun(unittest.TestCase):
 
         fake_print.assert_called_once_with(['WORKLIST'], sys.stdout, error_level=2, severity_mapping={'1': 'error'})
 
+    @patch('sap.cli.atc.print_worklists_to_stream')
+    @patch('sap.adt.objects.ADTObjectSets')
+    @patch('sap.adt.atc.ChecksRunner')
+    @patch('sap.adt.atc.fetch_customizing')
+    @patch('sap.adt.Package')
+    def test_output_written_to_stdout(self, fake_object, fake_fetch_customizing, fake_runner, fake_sets, fake_print):
+        self.setUpRunMocks(fake_object, '$PACKAGE', fake_fetch_customizing, fake_runner, fake_sets)
+
+        def fake_printer(results, stream, error_level):
+            stream.write('first\n')
+            stream.write('second\n')
+            return 1
+
+        fake_print.side_effect = fake_printer
+
+        args = parse_args('run', 'package', fake_object.name)
+        with patch('sys.stdout', new_callable=StringIO) as fake_stdout:
+            ret = args.execute(self.connection, args)
+
+        self.assertEqual(fake_stdout.getvalue(), 'first\nsecond\n')
+        self.assertEqual(ret, 1)
+
+
+class TestQuoteAttribute(unittest.TestCase):
+
+    def test_plain_value(self):
+        self.assertEqual(sap.cli.atc.quote_attribute('FAKE/TEST\u2215PACKAGE'), '"FAKE/TEST\u2215PACKAGE"')
+
+    def test_special_characters(self):
+        self.assertEqual(sap.cli.atc.quote_attribute('a < b & "c"'), '\'a &lt; b &amp; "c"\'')
+        self.assertEqual(sap.cli.atc.quote_attribute('line\nbreak'), '"line&#10;break"')
+
+
+class TestProfile(unittest.TestCase):
+
+    @patch('sap.adt.atc.fetch_profiles')
+    def test_profile_list_json(self, fake_fetch_profiles):
+        connection = Mock()
+        fake_fetch_profiles.return_value = {'PROFILE': {'description': 'Profile'}}
+
+        args = parse_args('profile', 'list', '-o', 'json')
+        with patch('sys.stdout', new_callable=StringIO) as fake_stdout:
+            args.execute(connection, args)
+
+        fake_fetch_profiles.assert_called_once_with(connection)
+        self.assertEqual(fake_stdout.getvalue(), '''{
+  "PROFILE": {
+    "description": "Profile"
+  }
+}
+''')
+
+    @patch('sap.adt.atc.dump_profiles')
+    def test_profile_dump(self, fake_dump_profiles):
+        connection = Mock()
+        fake_dump_profiles.return_value = {'profiles': {'PROFILE': {}}}
+
+        args = parse_args('profile', 'dump', '-p', 'PROFILE')
+        with patch('sys.stdout', new_callable=StringIO) as fake_stdout:
+            args.execute(connection, args)
+
+        fake_dump_profiles.assert_called_once_with(connection, ['PROFILE'], False)
+        self.assertEqual(fake_stdout.getvalue(), '''{
+  "profiles": {
+    "PROFILE": {}
+  }
+}
+''')
+
 
 class TestPrintWorklistMixin:
 
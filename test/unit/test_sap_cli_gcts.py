@@ -237,6 +237,19 @@ class TestgCTSRepoList(PatcherTestCase, ConsoleOutputTestCase):
 one   | one_branch   | 123    | CREATED | vS1D | one_url  
 two   | two_branch   | 456    | READY   | vS2D | two_url  
 three | third_branch | 7890   | CLONED  | vS3D | third_url
+''')
+
+    def test_repolist_empty(self):
+        conn = Mock()
+
+        self.fake_simple_fetch_repos.return_value = []
+
+        args = self.repolist()
+        args.execute(conn, args)
+
+        self.assertConsoleContents(self.console, stdout=
+'''Name | Branch | Commit | Status | vSID | URL
+--------------------------------------------
 ''')
 
     @patch('sap.cli.gcts.dump_gcts_messages')
@@ -530,7 +543,8 @@ class TestgCTSCommit(PatcherTestCase, ConsoleOutputTestCase):
                     'description': description
                 }
             ),
-            self
+            self,
+            json_body=True
         )
 
         self.assertConsoleContents(self.console, stdout=f'''The transport "{corrnr}" has been committed\n''')
@@ -551,7 +565,8 @@ class TestgCTSCommit(PatcherTestCase, ConsoleOutputTestCase):
                     'objects': [{'object': corrnr, 'type': 'TRANSPORT'}]
                 }
             ),
-            self
+            self,
+            json_body=True
         )
 
         self.assertConsoleContents(self.console, stdout=f'''The transport "{corrnr}" has been committed\n''')
@@ -195,8 +195,8 @@ class TestCommandGroupObjectTemplate(unittest.TestCase):
         self.assertEqual(args.corrnr, None)
         self.assertEqual(args.execute, self.group.write_object_text)
 
-        with patch('sys.stdin.readlines') as fake_readlines:
-            fake_readlines.return_value = 'source code'
+        with patch('sys.stdin.read') as fake_read:
+            fake_read.return_value = 'source code'
             args.execute(connection, args)
 
         self.group.instace_mock.assert_called_once_with(connection, 'myname', args, metadata=None)
@@ -236,8 +236,8 @@ class TestCommandGroupObjectTemplate(unittest.TestCase):
 
         self.assertEqual(args.corrnr, '123456')
 
-        with patch('sys.stdin.readlines') as fake_readlines:
-            fake_readlines.return_value = 'source code'
+        with patch('sys.stdin.read') as fake_read:
+            fake_read.return_value = 'source code'
             args.execute(connection, args)
 
         self.group.instace_mock.assert_called_once_with(connection, 'myname', args, metadata=None)
@@ -252,8 +252,8 @@ class TestCommandGroupObjectTemplate(unittest.TestCase):
 
         fake_activate.return_value = (sap.adt.wb.CheckResults(), None)
 
-        with patch('sys.stdin.readlines') as fake_readlines:
-            fake_readlines.return_value = 'source code'
+        with patch('sys.stdin.read') as fake_read:
+            fake_read.return_value = 'source code'
             args.execute(connection, args)
 
         fake_activate.assert_called_once_with(self.group.new_object_mock)
@@ -538,13 +538,13 @@ class TestWriteArgsToObjects(unittest.TestCase):
         args.name = 'zabap_object'
         args.source = ['-']
 
-        with patch('sys.stdin.readlines') as fake_readlines:
-            fake_readlines.return_value = ['source code']
+        with patch('sys.stdin.read') as fake_read:
+            fake_read.return_value = 'source code'
             objects = [obj_text for obj_text in sap.cli.object.write_args_to_objects(command, connection, args, metadata='metadata')]
 
-        fake_readlines.assert_called_once()
+        fake_read.assert_called_once()
         command.instance.assert_called_once_with(connection, 'zabap_object', args, metadata='metadata')
-        self.assertEqual([('instance', ['source code'])], objects)
+        self.assertEqual([('instance', 'source code')], objects)
 
     def test_name_with_file(self):
         command = MagicMock()
@@ -561,7 +561,7 @@ class TestWriteArgsToObjects(unittest.TestCase):
 
         fake_open.assert_called_once_with('zabap_object.abap', 'r', encoding='utf8')
         command.instance.assert_called_once_with(connection, 'zabap_object', args, metadata='metadata')
-        self.assertEqual([('instance', ['source code'])], objects)
+        self.assertEqual([('instance', 'source code')], objects)
 
     def test_name_dash_file_dash(self):
         command = MagicMock()
@@ -591,8 +591,8 @@ class TestWriteArgsToObjects(unittest.TestCase):
         self.assertEqual(fake_open.call_args_list, [call('zabap_object.abap', 'r', encoding='utf8'), call('zanother_object.abap', 'r', encoding='utf8')])
         self.assertEqual(command.instance_from_file_path.call_args_list, [call(connection, 'zabap_object.abap', args, metadata='metadata'),
                                                                           call(connection, 'zanother_object.abap', args, metadata='metadata')])
-        self.assertEqual(objects, [('instance', ['source code']),
-                                   ('instance', ['source code'])])
+        self.assertEqual(objects, [('instance', 'source code'),
+                                   ('instance', 'source code')])
 
 
 if __name__ == '__main__':
@@ -3,7 +3,7 @@
 from functools import partial
 
 import unittest
-from unittest.mock import Mock, patch
+from unittest.mock import Mock, PropertyMock, patch
 
 from sap.rest.connection import Connection
 from sap.rest.errors import UnauthorizedError
@@ -43,3 +43,31 @@ class TestConnectionExecute(unittest.TestCase):
             conn._execute_with_session(conn._session, method, url)
 
         self.assertEqual(str(caught.exception), f'Authorization for the user "{user}" has failed: {method} {url}')
+
+    @patch('sap.rest.connection.Connection._execute_with_session')
+    def test_session_reused(self, fake_execute):
+        fake_execute.return_value = Mock(headers={})
+
+        conn = Connection('/foo', '/bar', 'books.fr', '69', 'Arsan', 'Emmanuelle')
+
+        session = conn._get_session()
+        self.assertIs(conn._get_session(), session)
+        fake_execute.assert_called_once()
+
+    def test_retrieve_does_not_decode_body(self):
+        conn = Connection('/foo', '/bar', 'books.fr', '69', 'Arsan', 'Emmanuelle')
+
+        res = Mock()
+        text = PropertyMock(return_value='body')
+        type(res).text = text
+
+        session = Mock()
+        session.send.return_value = res
+
+        with patch('sap.rest.connection.mod_log') as fake_log:
+            fake_log.return_value.isEnabledFor.return_value = False
+            _, response = conn._retrieve(session, 'POST', '/all')
+
+        self.assertIs(response, res)
+        text.assert_not_called()
+
@@ -1,9 +1,11 @@
 #!/usr/bin/env python3
 
+import json
+import threading
 import unittest
 from unittest.mock import Mock, call, patch, PropertyMock
 
-from sap.rest.errors import HTTPRequestError, UnauthorizedError
+from sap.rest.errors import HTTPRequestError, UnauthorizedError, UnexpectedResponseContent
 
 import sap.rest.gcts
 
@@ -21,6 +23,29 @@ class TestgCTSUtils(unittest.TestCase):
         package = sap.rest.gcts.package_name_from_url('https://example.org/foo/git.no.suffix')
         self.assertEqual(package, 'git.no.suffix')
 
+    def test_parse_url_no_slash(self):
+        package = sap.rest.gcts.package_name_from_url('community.sap.git')
+        self.assertEqual(package, 'community.sap')
+
+
+    def test_json_loads_dumps(self):
+        obj = {'key': 'value', 'list': [1, 2]}
+
+        self.assertEqual(sap.rest.gcts.json_loads(sap.rest.gcts.json_dumps(obj)), obj)
+        self.assertEqual(sap.rest.gcts.json_loads(b'{"key": "value"}'), {'key': 'value'})
+
+        data = sap.rest.gcts.json_dumps({'url': 'Příliš.git'})
+        self.assertIsInstance(data, bytes)
+        self.assertEqual(json.loads(data.decode('utf-8')), {'url': 'Příliš.git'})
+
+    def test_json_loads_dumps_without_orjson(self):
+        obj = {'key': 'value', 'list': [1, 2]}
+
+        with patch('sap.rest.gcts.orjson', None):
+            self.assertEqual(sap.rest.gcts.json_dumps(obj), b'{"key": "value", "list": [1, 2]}')
+            self.assertEqual(sap.rest.gcts.json_dumps({'url': 'Příliš.git'}), b'{"url": "P\\u0159\\u00edli\\u0161.git"}')
+            self.assertEqual(sap.rest.gcts.json_loads(b'{"key": "value"}'), {'key': 'value'})
+
 
 class TestGCSTRequestError(unittest.TestCase):
 
@@ -144,6 +169,90 @@ class TestGCTSRepostiroy(GCTSTestSetUp, unittest.TestCase):
         self.assertEqual(len(self.conn.execs), 1)
         self.conn.execs[0].assertEqual(Request.get_json(uri=f'repository/{self.repo_name}'), self)
 
+    def test_properties_fetch_shared(self):
+        response = {'result': self.repo_server_data}
+
+        self.conn.set_responses([Response.with_json(json=response, status_code=200)])
+
+        first = sap.rest.gcts.Repository(self.conn, self.repo_name)
+        self.assertEqual(first.status, self.repo_server_data['status'])
+
+        second = sap.rest.gcts.Repository(self.conn, self.repo_name)
+        self.assertEqual(second.branch, self.repo_server_data['branch'])
+
+        self.assertEqual(len(self.conn.execs), 1)
+
+    def test_properties_fetch_shared_copies(self):
+        response = {'result': self.repo_server_data}
+
+        self.conn.set_responses([Response.with_json(json=response, status_code=200)])
+
+        first = sap.rest.gcts.Repository(self.conn, self.repo_name)
+        self.assertEqual(first.url, self.repo_server_data['url'])
+        first._data['url'] = 'https://example.com/local/change'
+
+        second = sap.rest.gcts.Repository(self.conn, self.repo_name)
+        self.assertEqual(second.url, self.repo_server_data['url'])
+
+        self.assertEqual(len(self.conn.execs), 1)
+
+    def test_properties_fetch_shared_wiped(self):
+        response = {'result': self.repo_server_data}
+
+        self.conn.set_responses([Response.with_json(json=response, status_code=200),
+                                 Response.with_json(json=response, status_code=200)])
+
+        first = sap.rest.gcts.Repository(self.conn, self.repo_name)
+        self.assertEqual(first.status, self.repo_server_data['status'])
+        first.wipe_data()
+
+        second = sap.rest.gcts.Repository(self.conn, self.repo_name)
+        self.assertEqual(second.branch, self.repo_server_data['branch'])
+
+        self.assertEqual(len(self.conn.execs), 2)
+
+    def test_properties_fetch_not_modified(self):
+        response = {'result': self.repo_server_data}
+
+        self.conn.set_responses([Response.with_json(json=response, status_code=200,
+                                                    headers={'ETag': '"abc"', 'Last-Modified': 'yesterday'}),
+                                 Response(status_code=304),
+                                 Response.with_json(json=response, status_code=200)])
+
+        repo = sap.rest.gcts.Repository(self.conn, self.repo_name)
+        self.assertEqual(repo.status, self.repo_server_data['status'])
+
+        repo.wipe_data()
+        self.assertEqual(repo.branch, self.repo_server_data['branch'])
+
+        repo.wipe_data(force=True)
+        self.assertEqual(repo.url, self.repo_server_data['url'])
+
+        self.assertEqual(len(self.conn.execs), 3)
+        self.conn.execs[0].assertEqual(Request.get_json(uri=f'repository/{self.repo_name}'), self)
+        self.conn.execs[1].assertEqual(
+            Request.get_json(uri=f'repository/{self.repo_name}',
+                             headers={'If-None-Match': '"abc"', 'If-Modified-Since': 'yesterday'}),
+            self
+        )
+        self.conn.execs[2].assertEqual(Request.get_json(uri=f'repository/{self.repo_name}'), self)
+
+    def test_properties_fetch_modified_not_json(self):
+        response = {'result': self.repo_server_data}
+
+        self.conn.set_responses([Response.with_json(json=response, status_code=200, headers={'ETag': '"abc"'}),
+                                 Response(status_code=200, text='<html>Login</html>', content_type='text/html')])
+
+        repo = sap.rest.gcts.Repository(self.conn, self.repo_name)
+        self.assertEqual(repo.status, self.repo_server_data['status'])
+
+        repo.wipe_data()
+        with self.assertRaises(UnexpectedResponseContent) as caught:
+            unused = repo.status
+
+        self.assertEqual(caught.exception.received, 'text/html')
+        self.assertEqual(caught.exception.content, '<html>Login</html>')
+
     def test_properties_fetch_error(self):
         messages = LogBuilder(exception='Get Repo Error').get_contents()
         self.conn.set_responses(Response.with_json(status_code=500, json=messages))
@@ -183,6 +292,20 @@ class TestGCTSRepostiroy(GCTSTestSetUp, unittest.TestCase):
         self.conn.execs[0].assertEqual(Request.post_json(uri=f'repository', body=repo_request, accept='application/json'),
                                        self, json_body=True)
 
+    def test_create_not_cloned(self):
+        repository = dict(self.repo_server_data)
+        del repository['status']
+
+        self.conn.set_responses(
+            Response.with_json(status_code=201, json={'repository': repository})
+        )
+
+        repo = sap.rest.gcts.Repository(self.conn, self.repo_name)
+        repo.create(self.repo_url, self.repo_vsid)
+
+        self.assertFalse(repo.is_cloned)
+        self.assertEqual(len(self.conn.execs), 1)
+
     def test_create_with_config_update_instance(self):
         self.conn.set_responses(
             Response.with_json(status_code=201, json={'repository': self.repo_server_data})
@@ -251,6 +374,38 @@ class TestGCTSRepostiroy(GCTSTestSetUp, unittest.TestCase):
         self.assertEqual(len(self.conn.execs), 1)
         self.conn.execs[0].assertEqual(Request.post_json(uri=f'repository/{self.repo_name}/config', body={'key': 'VCS_CONNECTION', 'value': 'git'}), self, json_body=True)
 
+    def test_set_configs_success(self):
+        repo = sap.rest.gcts.Repository(self.conn, self.repo_name, data=self.repo_server_data)
+        repo.set_configs({'VCS_CONNECTION': 'git', 'THE_KEY': 'the value'})
+
+        self.assertEqual(repo.get_config('VCS_CONNECTION'), 'git')
+        self.assertEqual(repo.get_config('THE_KEY'), 'the value')
+
+        self.assertEqual(len(self.conn.execs), 2)
+        self.conn.execs[0].assertEqual(Request.post_json(uri=f'repository/{self.repo_name}/config', body={'key': 'VCS_CONNECTION', 'value': 'git'}), self, json_body=True)
+        self.conn.execs[1].assertEqual(Request.post_json(uri=f'repository/{self.repo_name}/config', body={'key': 'THE_KEY', 'value': 'the value'}), self, json_body=True)
+
+    def test_set_configs_error_invalidates_shared_data(self):
+        messages = LogBuilder(exception='Set Config Error').get_contents()
+        response = {'result': self.repo_server_data}
+
+        self.conn.set_responses([Response.with_json(json=response, status_code=200),
+                                 Response.ok(),
+                                 Response.with_json(status_code=500, json=messages),
+                                 Response.with_json(json=response, status_code=200)])
+
+        repo = sap.rest.gcts.Repository(self.conn, self.repo_name)
+        self.assertEqual(repo.status, self.repo_server_data['status'])
+
+        with self.assertRaises(sap.rest.gcts.GCTSRequestError):
+            repo.set_configs({'VCS_CONNECTION': 'git', 'THE_KEY': 'the value'})
+
+        other = sap.rest.gcts.Repository(self.conn, self.repo_name)
+        self.assertEqual(other.status, self.repo_server_data['status'])
+
+        self.assertEqual(len(self.conn.execs), 4)
+        self.conn.execs[3].assertEqual(Request.get_json(uri=f'repository/{self.repo_name}'), self)
+
     def test_set_config_error(self):
         messages = LogBuilder(exception='Set Config Error').get_contents()
 
@@ -463,7 +618,8 @@ class TestGCTSRepostiroy(GCTSTestSetUp, unittest.TestCase):
                     'description': description
                 }
             ),
-            self
+            self,
+            json_body=True
         )
 
         self.assertIsNone(repo._data)
@@ -494,7 +650,8 @@ class TestGCTSRepostiroy(GCTSTestSetUp, unittest.TestCase):
                 uri=f'repository/{self.repo_name}',
                 body=request_with_url
             ),
-            self
+            self,
+            json_body=True
         )
 
     def test_set_url_nochange(self):
@@ -515,6 +672,48 @@ class TestGCTSRepostiroy(GCTSTestSetUp, unittest.TestCase):
 
         self.assertIsNone(response)
 
+    def test_set_url_cached_data(self):
+        NEW_URL = 'https://random.github.org/awesome/success'
+
+        self.conn.set_responses(Response.ok())
+
+        repo = sap.rest.gcts.Repository(self.conn, self.repo_name, data=dict(self.repo_server_data))
+        repo.set_url(NEW_URL)
+
+        request_with_url = dict(self.repo_server_data)
+        request_with_url['url'] = NEW_URL
+
+        self.assertEqual(len(self.conn.execs), 1)
+        self.conn.execs[0].assertEqual(
+            Request.post_json(
+                uri=f'repository/{self.repo_name}',
+                body=request_with_url
+            ),
+            self,
+            json_body=True
+        )
+        self.assertEqual(repo.url, NEW_URL)
+
+    def test_set_url_error(self):
+        NEW_URL = 'https://random.github.org/awesome/success'
+        messages = LogBuilder(exception='Set URL Error').get_contents()
+        response = {'result': self.repo_server_data}
+
+        self.conn.set_responses(
+            Response.with_json(status_code=200, json=response),
+            Response.with_json(status_code=500, json=messages),
+            Response.with_json(status_code=200, json=response)
+        )
+
+        repo = sap.rest.gcts.Repository(self.conn, self.repo_name)
+        self.assertEqual(repo.url, self.repo_url)
+
+        with self.assertRaises(sap.rest.gcts.GCTSRequestError):
+            repo.set_url(NEW_URL)
+
+        self.assertEqual(repo.url, self.repo_url)
+        self.assertEqual(sap.rest.gcts.Repository(self.conn, self.repo_name).url, self.repo_url)
+
 
 class TestgCTSSimpleAPI(GCTSTestSetUp, unittest.TestCase):
 
@@ -677,6 +876,83 @@ class TestgCTSSimpleAPI(GCTSTestSetUp, unittest.TestCase):
         self.conn.execs[0].assertEqual(Request.get_json(uri=f'repository'), self)
 
 
+    def test_simple_fetch_hydrates_repositories(self):
+        repo_one = dict(self.repo_server_data)
+        repo_one['name'] = repo_one['rid'] = 'one'
+
+        repo_two = dict(self.repo_server_data)
+        repo_two['name'] = repo_two['rid'] = 'two'
+        del repo_two['config']
+
+        self.conn.set_responses(
+            Response.with_json(status_code=200, json={'result': [repo_one, repo_two]}),
+            Response.with_json(status_code=200, json={'result': self.repo_server_data})
+        )
+
+        sap.rest.gcts.simple_fetch_repos(self.conn)
+
+        repo = sap.rest.gcts.Repository(self.conn, 'one')
+        self.assertEqual(repo.configuration, {'VCS_CONNECTION': 'SSL', 'CLIENT_VCS_URI': ''})
+        self.assertEqual(len(self.conn.execs), 1)
+
+        repo = sap.rest.gcts.Repository(self.conn, 'two')
+        self.assertEqual(repo.branch, self.repo_server_data['branch'])
+        self.assertEqual(len(self.conn.execs), 2)
+        self.conn.execs[1].assertEqual(Request.get_json(uri='repository/two'), self)
+
+    def test_simple_fetch_eager_config(self):
+        repo_one = dict(self.repo_server_data)
+        repo_one['name'] = repo_one['rid'] = 'one'
+
+        repo_two = dict(self.repo_server_data)
+        repo_two['name'] = repo_two['rid'] = 'two'
+        del repo_two['config']
+
+        repo_two_full = dict(self.repo_server_data)
+        repo_two_full['name'] = repo_two_full['rid'] = 'two'
+        repo_two_full['config'] = [{'key': 'VCS_TARGET_DIR', 'value': 'src/'}]
+
+        self.conn.set_responses(
+            Response.with_json(status_code=200, json={'result': [repo_one, repo_two]}),
+            Response.with_json(status_code=200, json={'result': repo_two_full})
+        )
+
+        repos = sap.rest.gcts.simple_fetch_repos(self.conn, eager_config=True)
+
+        self.assertEqual(len(self.conn.execs), 2)
+        self.conn.execs[1].assertEqual(Request.get_json(uri='repository/two'), self)
+
+        self.assertEqual(repos[0].configuration, {'VCS_CONNECTION': 'SSL', 'CLIENT_VCS_URI': ''})
+        self.assertEqual(repos[1].configuration, {'VCS_TARGET_DIR': 'src/'})
+
+        repo = sap.rest.gcts.Repository(self.conn, 'two')
+        self.assertEqual(repo.configuration, {'VCS_TARGET_DIR': 'src/'})
+        self.assertEqual(len(self.conn.execs), 2)
+
+    def test_hydrate_configs_complete(self):
+        repo = sap.rest.gcts.Repository(self.conn, self.repo_name, data=self.repo_server_data)
+
+        self.assertEqual(sap.rest.gcts.hydrate_configs([repo]), [repo])
+        self.assertEqual(len(self.conn.execs), 0)
+
+
+    def test_hydrate_configs_first_fetch_serial(self):
+        fetch_threads = {}
+
+        def fetch_data(repo):
+            fetch_threads[repo.name] = threading.current_thread()
+            return {'name': repo.name, 'config': [{'key': 'NAME', 'value': repo.name}]}
+
+        names = ['one', 'two', 'three']
+        repos = [sap.rest.gcts.Repository(self.conn, name, data={'name': name}) for name in names]
+
+        with patch('sap.rest.gcts.Repository._fetch_data', autospec=True, side_effect=fetch_data):
+            self.assertEqual(sap.rest.gcts.hydrate_configs(repos), repos)
+
+        self.assertIs(fetch_threads['one'], threading.main_thread())
+        self.assertEqual(sorted(fetch_threads), sorted(names))
+        self.assertEqual([repo.configuration['NAME'] for repo in repos], names)
+
     def test_simple_fetch_error(self):
         messages = LogBuilder(exception='Fetch Error').get_contents()
         self.conn.set_responses(Response.with_json(status_code=500, json=messages))